@@ -9,10 +9,37 @@ extends Node
 @onready var text_output: TextEdit = %TextOutput
 @onready var status_output: TextEdit = %TextStatus
 @onready var http_request_node: HTTPRequest = %HTTPRequest
+@onready var receive_progress: ProgressBar = %ReceiveProgress
+@onready var auto_sync_toggle: CheckButton = %AutoSyncToggle
 @onready var context_exit: Control = %ContextExit
 
+# Received text is streamed to this file instead of being held in memory,
+# only the first RECEIVE_PREVIEW_BYTES of it are loaded into the output field
+const RECEIVE_FILE_PATH: String = "user://received_text.txt"
+const RECEIVE_PREVIEW_BYTES: int = 64 * 1024
+const RECEIVE_BODY_LIMIT: int = 512 * 1024 * 1024
+
+# Auto sync polls fast right after a change and backs off while nothing happens
+const SYNC_MIN_INTERVAL: float = 1.0
+const SYNC_MAX_INTERVAL: float = 60.0
+const SYNC_BACKOFF_FACTOR: float = 2.0
+const SYNC_JITTER: float = 0.2 # +/- fraction applied to every interval
+
+enum SyncResult {CHANGED, UNCHANGED, FAILED}
+
 var server_base_url: String = ""
-var _last_initiated_method: int # Will store HTTPClient.METHOD_GET or HTTPClient.METHOD_POST
+var _last_initiated_method: int = -1 # Will store HTTPClient.METHOD_GET or HTTPClient.METHOD_POST, -1 when idle
+var _is_auto_sync_request: bool = false
+var _pending_send: bool = false
+var _pending_receive: bool = false
+var _pending_receive_is_auto: bool = false
+var _last_received_md5: String = ""
+var _last_etag: String = "" # Sent as If-None-Match on auto-sync polls
+var _sent_text_md5: String = ""
+
+var _sync_timer: Timer
+var _sync_interval: float = SYNC_MIN_INTERVAL
+var _sync_paused: bool = false
 
 
 func _ready():
@@ -21,6 +48,14 @@ func _ready():
     send_button.pressed.connect(_on_send_button_pressed)
     receive_button.pressed.connect(_on_receive_button_pressed)
     http_request_node.request_completed.connect(_on_request_completed)
+    http_request_node.body_size_limit = RECEIVE_BODY_LIMIT
+    set_process(false)
+
+    _sync_timer = Timer.new()
+    _sync_timer.one_shot = true
+    _sync_timer.timeout.connect(_on_sync_timer_timeout)
+    add_child(_sync_timer)
+    auto_sync_toggle.toggled.connect(_on_auto_sync_toggled)
     
     _log_status("Client initialized. Enter Server IP:Port and send/receive text.")
 
@@ -73,9 +108,17 @@ func _on_send_button_pressed():
         _log_status("Error: Text to send is empty. Action aborted.")
         return
 
+    if _is_request_busy():
+        # Sent once the current request finishes, with whatever text is in the field then
+        _pending_send = true
+        _log_status("Status: Waiting for the current request to finish before sending...")
+        return
+
     var headers = ["Content-Type: text/plain; charset=utf-8"]
     
     _last_initiated_method = HTTPClient.METHOD_POST # Store the method
+    http_request_node.download_file = "" # Keep the short confirmation in memory
+    _sent_text_md5 = text_to_send.md5_text()
     var error = http_request_node.request(url, headers, HTTPClient.METHOD_POST, text_to_send)
     
     if error == OK:
@@ -89,33 +132,222 @@ func _on_receive_button_pressed():
     if not _update_server_url():
         return
 
+    _request_text(false)
+
+func _request_text(is_auto: bool):
+    if _is_request_busy():
+        # Overlapping receives collapse into a single follow-up request
+        _pending_receive_is_auto = (_pending_receive_is_auto and is_auto) if _pending_receive else is_auto
+        _pending_receive = true
+        if not is_auto:
+            _log_status("Status: Waiting for the current request to finish before receiving...")
+        return
+
     var url = server_base_url + "/text"
     
     _last_initiated_method = HTTPClient.METHOD_GET # Store the method
-    var error = http_request_node.request(url, [], HTTPClient.METHOD_GET, "")
+    _is_auto_sync_request = is_auto
+    http_request_node.download_file = RECEIVE_FILE_PATH
+    var headers: PackedStringArray = []
+    if is_auto and not _last_etag.is_empty():
+        # Lets the server answer 304 without a body when nothing changed
+        headers.append("If-None-Match: " + _last_etag)
+    var error = http_request_node.request(url, headers, HTTPClient.METHOD_GET, "")
     
     if error == OK:
-        _log_status("Status: Requesting text from %s..." % url)
+        if not is_auto: # Background polls stay silent, the bar would flicker on every one
+            _log_status("Status: Requesting text from %s..." % url)
+            _start_receive_progress()
     else:
         _last_initiated_method = -1 # Reset if request failed to start
+        _is_auto_sync_request = false
         _log_status("Error: Failed to start receive request. Code: %s" % error)
         push_error("HTTPRequest (GET) error: " + str(error))
+        _schedule_next_sync(SyncResult.FAILED)
 
-func _on_request_completed(_result: int, response_code: int, _headers: PackedStringArray, body: PackedByteArray):
+func _is_request_busy() -> bool:
+    return _last_initiated_method != -1
+
+func _flush_pending_requests():
+    if _is_request_busy():
+        return
+    if _pending_send:
+        _pending_send = false
+        _on_send_button_pressed()
+    elif _pending_receive:
+        _pending_receive = false
+        _request_text(_pending_receive_is_auto)
+
+func _on_auto_sync_toggled(enabled: bool):
+    if not enabled:
+        _sync_timer.stop()
+        _log_status("Status: Auto sync disabled.")
+        return
+    if not _update_server_url():
+        auto_sync_toggle.set_pressed_no_signal(false)
+        return
+    _sync_interval = SYNC_MIN_INTERVAL
+    _log_status("Status: Auto sync enabled for %s." % server_base_url)
+    _on_sync_timer_timeout()
+
+func _on_sync_timer_timeout():
+    if not auto_sync_toggle.button_pressed or _sync_paused:
+        return
+    if not _update_server_url():
+        auto_sync_toggle.button_pressed = false # Address was edited into something invalid
+        return
+    _request_text(true)
+
+func _schedule_next_sync(result: SyncResult):
+    if not auto_sync_toggle.button_pressed or _sync_paused:
+        return
+    if result == SyncResult.CHANGED:
+        _sync_interval = SYNC_MIN_INTERVAL
+    else:
+        _sync_interval = minf(_sync_interval * SYNC_BACKOFF_FACTOR, SYNC_MAX_INTERVAL)
+    # Jitter keeps several clients from polling the server in lockstep
+    _sync_timer.start(_sync_interval * randf_range(1.0 - SYNC_JITTER, 1.0 + SYNC_JITTER))
+
+func _notification(what: int):
+    if _sync_timer == null:
+        return
+    match what:
+        NOTIFICATION_APPLICATION_PAUSED, NOTIFICATION_APPLICATION_FOCUS_OUT:
+            # No polling while the app is in the background
+            _sync_paused = true
+            _sync_timer.stop()
+        NOTIFICATION_APPLICATION_RESUMED, NOTIFICATION_APPLICATION_FOCUS_IN:
+            if _sync_paused:
+                _sync_paused = false
+                _sync_interval = SYNC_MIN_INTERVAL
+                if auto_sync_toggle.button_pressed:
+                    _on_sync_timer_timeout()
+
+func _process(_delta: float):
+    # Only runs while a receive is in flight, see _start_receive_progress
+    var downloaded = http_request_node.get_downloaded_bytes()
+    var total = http_request_node.get_body_size()
+    if total > 0:
+        receive_progress.max_value = total
+        receive_progress.value = downloaded
+    else: # Unknown length (e.g. chunked), keep the bar moving
+        receive_progress.max_value = downloaded + 1
+        receive_progress.value = downloaded
+
+func _start_receive_progress():
+    receive_progress.value = 0
+    receive_progress.show()
+    set_process(true)
+
+func _stop_receive_progress():
+    set_process(false)
+    receive_progress.hide()
+
+func _trim_to_utf8_boundary(bytes: PackedByteArray) -> PackedByteArray:
+    # Drops a multi-byte character that got cut off at the end of a preview
+    var end = bytes.size()
+    var continuation_bytes = 0
+    while end > 0 and (bytes[end - 1] & 0xC0) == 0x80 and continuation_bytes < 3:
+        end -= 1
+        continuation_bytes += 1
+    if end > 0 and bytes[end - 1] >= 0xC0:
+        var lead = bytes[end - 1]
+        var expected = 1 if lead < 0xE0 else (2 if lead < 0xF0 else 3)
+        if continuation_bytes < expected:
+            return bytes.slice(0, end - 1)
+    return bytes
+
+func _peak_memory_note() -> String:
+    # Godot only tracks static memory in debug builds, release exports would always report 0
+    if not OS.is_debug_build():
+        return ""
+    return ", peak static memory %s" % String.humanize_size(int(Performance.get_monitor(Performance.MEMORY_STATIC_MAX)))
+
+func _load_received_preview() -> int:
+    # Returns the full size of the received file, or -1 if it couldn't be read
+    var file = FileAccess.open(RECEIVE_FILE_PATH, FileAccess.READ)
+    if file == null:
+        _log_status("Error: Could not open received file. Code: %s" % FileAccess.get_open_error())
+        return -1
+    var total_size = file.get_length()
+    var preview = file.get_buffer(mini(total_size, RECEIVE_PREVIEW_BYTES))
+    file.close()
+    if total_size > RECEIVE_PREVIEW_BYTES:
+        preview = _trim_to_utf8_boundary(preview)
+    text_output.text = preview.get_string_from_utf8()
+    return total_size
+
+func _on_request_completed(_result: int, response_code: int, headers: PackedStringArray, body: PackedByteArray):
+    _stop_receive_progress()
+    if _last_initiated_method == HTTPClient.METHOD_GET and (not _is_auto_sync_request or _pending_receive_is_auto):
+        # Whatever was queued just got fresh text. A manual receive queued behind an
+        # auto poll still runs, the poll may leave the output field untouched.
+        _pending_receive = false
+    var sync_result = _handle_response(_result, response_code, headers, body)
+    _last_initiated_method = -1 # Reset after handling
+    _is_auto_sync_request = false
+    _schedule_next_sync(sync_result)
+    _flush_pending_requests.call_deferred()
+
+func _get_header(headers: PackedStringArray, name: String, default: String = "") -> String:
+    var prefix = name.to_lower() + ":"
+    for header in headers:
+        if header.to_lower().begins_with(prefix):
+            return header.substr(header.find(":") + 1).strip_edges()
+    return default
+
+func _is_text_content_type(content_type: String) -> bool:
+    var media_type = content_type.get_slice(";", 0).strip_edges().to_lower()
+    return media_type.begins_with("text/") or media_type in ["application/json", "application/xml", "application/javascript", "application/x-sh"]
+
+func _handle_response(_result: int, response_code: int, headers: PackedStringArray, body: PackedByteArray) -> SyncResult:
+    if _result == HTTPRequest.RESULT_BODY_SIZE_LIMIT_EXCEEDED:
+        _log_status("Error: Received text is larger than %s bytes. Transfer aborted." % RECEIVE_BODY_LIMIT)
+        return SyncResult.FAILED
     if _result != HTTPRequest.RESULT_SUCCESS:
         _log_status("Connection Error: Request failed. Result code: %s. Check server address and network." % _result)
         push_error("HTTPRequest failed! Result: " + str(_result))
-        _last_initiated_method = -1 # Reset on failure
-        return
+        return SyncResult.FAILED
+
+    if response_code == 304: # Not Modified, answer to an auto-sync If-None-Match
+        return SyncResult.UNCHANGED
 
     var response_body_text = body.get_string_from_utf8()
+    if _last_initiated_method == HTTPClient.METHOD_GET and response_code != 200 and FileAccess.file_exists(RECEIVE_FILE_PATH):
+        # Error messages from the server were streamed to the file as well
+        response_body_text = FileAccess.get_file_as_string(RECEIVE_FILE_PATH).left(200)
     
     if response_code == 200: # HTTP OK
         if _last_initiated_method == HTTPClient.METHOD_GET:
-            text_output.text = response_body_text # Update the separate output field
-            _log_status("Status: Text received successfully from server.")
+            # The body went straight to RECEIVE_FILE_PATH, so `body` is empty here
+            _last_etag = _get_header(headers, "ETag")
+            var received_md5 = FileAccess.get_md5(RECEIVE_FILE_PATH)
+            var changed = received_md5 != _last_received_md5
+            _last_received_md5 = received_md5
+            if _is_auto_sync_request and not changed:
+                return SyncResult.UNCHANGED # Leave the output field (and any edits in it) alone
+            var content_type = _get_header(headers, "Content-Type", "text/plain")
+            if not _is_text_content_type(content_type):
+                # Images, archives etc. are kept as-is in the file, there's nothing to preview
+                text_output.text = ""
+                _log_status("Status: Received %s (%s). Saved to %s" % [content_type,
+                    String.humanize_size(http_request_node.get_downloaded_bytes()),
+                    ProjectSettings.globalize_path(RECEIVE_FILE_PATH)])
+                return SyncResult.CHANGED if changed else SyncResult.UNCHANGED
+            var received_size = _load_received_preview()
+            if received_size < 0:
+                return SyncResult.FAILED
+            _log_status("Status: Text received successfully from server (%s%s)." % [
+                String.humanize_size(received_size), _peak_memory_note()])
+            if received_size > RECEIVE_PREVIEW_BYTES:
+                _log_status("Status: Showing the first %s. Full text saved to %s" % [
+                    String.humanize_size(RECEIVE_PREVIEW_BYTES), ProjectSettings.globalize_path(RECEIVE_FILE_PATH)])
+            return SyncResult.CHANGED if changed else SyncResult.UNCHANGED
         elif _last_initiated_method == HTTPClient.METHOD_POST:
             _log_status("Status: Text sent. Server confirmation: \"%s\"" % response_body_text)
+            # Our own text coming back on the next poll isn't news
+            _last_received_md5 = _sent_text_md5
+            return SyncResult.CHANGED
         else:
             _log_status("Status: Request successful (Code %s), unknown method. Server response: \"%s\"" % [response_code, response_body_text])
     
@@ -127,7 +359,7 @@ func _on_request_completed(_result: int, response_code: int, _headers: PackedStr
         _log_status("Server Error (Code %s): %s" % [response_code, response_body_text])
         push_error("Server error %s: %s" % [response_code, response_body_text])
     
-    _last_initiated_method = -1 # Reset after handling
+    return SyncResult.FAILED
 
 # func _unhandled_input(event: InputEvent):
 #     if ipport_input.has_focus() and event.is_action_pressed("ui_accept"):
@@ -0,0 +1,80 @@
+"""
+Benchmarks shared text display updates for payloads from 1 KB to 100 MB.
+
+Always times the page decode path. When a display is available (run under
+xvfb-run on a headless machine), it also times a full
+SharedTextView.refresh on a withdrawn Tk window.
+
+Usage: python bench_display.py
+"""
+
+import time
+import tkinter as tk
+from tkinter import scrolledtext, ttk
+
+from main import (
+    TEXT_CONTENT_TYPE,
+    ContentPages,
+    Replicator,
+    SharedContent,
+    SharedTextView,
+    TransferHistory,
+)
+
+SIZES = [1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 100 * 1024 * 1024]
+LINE = "LocalFetch shared text benchmark line, with some non-ASCII: ü€\n"
+
+
+def make_view(root, content):
+    frame = ttk.LabelFrame(root, text="Shared Text")
+    frame.pack()
+    text_widget = scrolledtext.ScrolledText(frame, wrap=tk.WORD)
+    text_widget.pack()
+    return SharedTextView(root, frame, text_widget, content)
+
+
+def make_payload(size):
+    line = LINE.encode("utf-8")
+    return (line * (size // len(line) + 1))[:size]
+
+
+def main():
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError as e:
+        root = None
+        print(f"No display ({e}), only timing the decode path.")
+
+    # History off, the benchmark only cares about the display
+    content = SharedContent(
+        b"", TEXT_CONTENT_TYPE, Replicator(), TransferHistory(max_entries=0)
+    )
+    view = make_view(root, content) if root is not None else None
+
+    for size in SIZES:
+        data = make_payload(size)
+        started_at = time.perf_counter()
+        ContentPages(data).decode(0)
+        decode_ms = (time.perf_counter() - started_at) * 1000
+        line = f"{size:>11,} bytes  decode first page {decode_ms:8.3f} ms"
+
+        if view is not None:
+            content.update(data, TEXT_CONTENT_TYPE, "Bench")
+            started_at = time.perf_counter()
+            view.refresh()
+            root.update_idletasks()
+            update_ms = (time.perf_counter() - started_at) * 1000
+
+            started_at = time.perf_counter()
+            view.refresh()  # Same version, should be skipped
+            skip_ms = (time.perf_counter() - started_at) * 1000
+            line += f"  full update {update_ms:8.3f} ms  unchanged {skip_ms:6.3f} ms"
+        print(line)
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Benchmarks peer replication between three local servers.
+
+Starts three LocalFetch servers on loopback ports (an HTTPServer with the real
+handler, replicator and shared content, no Tk) and reports how long an update takes to show
+up on the other servers, how many updates per second they keep up with, and
+whether they converge. It runs a full mesh, a chain where the middle server
+has to forward, and a mesh where one server also has a dead peer.
+
+Usage: python bench_replication.py [base_port]
+"""
+
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import HTTPServer
+
+import main
+from main import (
+    TEXT_CONTENT_TYPE,
+    LocalFetchHandler,
+    Replicator,
+    RequestProfiler,
+    SharedContent,
+    TransferHistory,
+)
+
+LAG_SAMPLES = 20
+THROUGHPUT_UPDATES = 200
+LARGE_PAYLOAD_BYTES = 1024 * 1024
+POLL_INTERVAL = 0.002
+CONVERGE_TIMEOUT = 10.0
+
+
+class BenchServer:
+    """What LocalFetchHandler uses from the app, without a window."""
+
+    def __init__(self, peers):
+        self.profiler = RequestProfiler()
+        self.history = TransferHistory()
+        self.replicator = Replicator(peers, log=self.log_to_gui)
+        self.content = SharedContent(b"", TEXT_CONTENT_TYPE, self.replicator, self.history)
+
+    def log_to_gui(self, message):
+        print(message, flush=True)
+
+
+class QuietHandler(LocalFetchHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def run_node(peers):
+    """Serves one node until killed, the port comes from LOCALFETCH_PORT."""
+    port = main.configured_port()
+    server = main.app_instance_ref = BenchServer(peers)
+    httpd = HTTPServer(("127.0.0.1", port), QuietHandler)
+    server.replicator.start(server.content.apply_replicated)
+    httpd.serve_forever()
+
+
+class Cluster:
+    def __init__(self, ports, peers_of):
+        self.ports = ports
+        self.processes = []
+        for port in ports:
+            env = dict(os.environ, **{main.PORT_ENV_VAR: str(port)})
+            self.processes.append(
+                subprocess.Popen(
+                    [sys.executable, __file__, "node", *peers_of[port]],
+                    env=env,
+                    stdout=subprocess.DEVNULL,
+                )
+            )
+        for port in ports:
+            self._wait_until_up(port)
+
+    def _wait_until_up(self, port):
+        deadline = time.monotonic() + CONVERGE_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                self.get(port)
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"Node on port {port} did not start")
+
+    def close(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait()
+
+    @staticmethod
+    def _request(port, method, body=None):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            headers = {"Content-Type": TEXT_CONTENT_TYPE} if body is not None else {}
+            connection.request(method, "/text", body=body, headers=headers)
+            response = connection.getresponse()
+            return response.read()
+        finally:
+            connection.close()
+
+    def get(self, port):
+        return self._request(port, "GET")
+
+    def post(self, port, data):
+        self._request(port, "POST", data)
+
+    def wait_for(self, ports, data):
+        """Seconds until every port serves `data`, None if it never does."""
+        started_at = time.perf_counter()
+        pending = set(ports)
+        while pending:
+            pending = {port for port in pending if self.get(port) != data}
+            if time.perf_counter() - started_at > CONVERGE_TIMEOUT:
+                return None
+            if pending:
+                time.sleep(POLL_INTERVAL)
+        return time.perf_counter() - started_at
+
+
+def measure_lag(cluster, source, label, payload_size=0):
+    others = [port for port in cluster.ports if port != source]
+    samples = []
+    for i in range(LAG_SAMPLES):
+        data = f"{label} update {i} ".encode("utf-8").ljust(payload_size, b"x")
+        started_at = time.perf_counter()
+        cluster.post(source, data)
+        if cluster.wait_for(others, data) is None:
+            print(f"  {label}: update {i} never reached every server")
+            return
+        samples.append((time.perf_counter() - started_at) * 1000)
+    print(
+        f"  {label:<28} lag median {statistics.median(samples):7.1f} ms  "
+        f"max {max(samples):7.1f} ms"
+    )
+
+
+def measure_throughput(cluster, source):
+    started_at = time.perf_counter()
+    for i in range(THROUGHPUT_UPDATES):
+        last = f"burst {i}".encode("utf-8")
+        cluster.post(source, last)
+    label = f"{THROUGHPUT_UPDATES} updates back-to-back"
+    if cluster.wait_for(cluster.ports, last) is None:
+        print(f"  {label:<28} never converged")
+        return
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"  {label:<28} converged in {elapsed * 1000:7.1f} ms "
+        f"({THROUGHPUT_UPDATES / elapsed:,.0f} updates/s)"
+    )
+
+
+def measure_conflict(cluster):
+    """Two servers write at once, all of them must end up with the same winner."""
+    first, last = cluster.ports[0], cluster.ports[-1]
+    writers = [
+        threading.Thread(
+            target=cluster.post, args=(port, f"written on {port}".encode("utf-8"))
+        )
+        for port in (first, last)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    deadline = time.monotonic() + CONVERGE_TIMEOUT
+    while time.monotonic() < deadline:
+        contents = {cluster.get(port) for port in cluster.ports}
+        if len(contents) == 1:
+            print(f"  {'concurrent writes':<28} converged on {contents.pop().decode()!r}")
+            return
+        time.sleep(POLL_INTERVAL)
+    print(f"  {'concurrent writes':<28} did NOT converge: {contents}")
+
+
+def run_scenario(title, ports, peers_of, lag_sources):
+    print(title)
+    cluster = Cluster(ports, peers_of)
+    try:
+        for source in lag_sources:
+            measure_lag(cluster, source, f"small from :{source}")
+        measure_lag(cluster, ports[0], f"1 MB from :{ports[0]}", LARGE_PAYLOAD_BYTES)
+        measure_throughput(cluster, ports[0])
+        measure_conflict(cluster)
+    finally:
+        cluster.close()
+
+
+def main_bench():
+    base_port = int(sys.argv[1]) if len(sys.argv) > 1 else 8100
+    ports = [base_port, base_port + 1, base_port + 2]
+    addresses = {port: f"127.0.0.1:{port}" for port in ports}
+    dead_peer = f"127.0.0.1:{base_port + 9}"  # Nothing listens here
+
+    mesh = {port: [addresses[p] for p in ports if p != port] for port in ports}
+    chain = {
+        ports[0]: [addresses[ports[1]]],
+        ports[1]: [addresses[ports[0]], addresses[ports[2]]],
+        ports[2]: [addresses[ports[1]]],
+    }
+    with_dead_peer = {**mesh, ports[0]: mesh[ports[0]] + [dead_peer]}
+
+    run_scenario("Full mesh", ports, mesh, [ports[0]])
+    run_scenario("Chain (middle server forwards)", ports, chain, [ports[0], ports[2]])
+    run_scenario(f"Full mesh, :{ports[0]} also has a dead peer", ports, with_dead_peer, [ports[0]])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "node":
+        run_node(sys.argv[2:])
+    else:
+        main_bench()
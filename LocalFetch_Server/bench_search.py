@@ -0,0 +1,80 @@
+"""
+Benchmarks the transfer history search index.
+
+Fills a TransferHistory with synthetic texts and reports insert cost, index
+size and query latency for rare and common terms.
+
+Usage: python bench_search.py [entry_count]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from main import TransferHistory
+
+VOCABULARY_SIZE = 20_000
+TERMS_PER_ENTRY = 10
+QUERY_REPEATS = 20
+
+
+def build_history(entry_count, rng):
+    vocabulary = [f"w{i}" for i in range(VOCABULARY_SIZE)]
+    history = TransferHistory(max_entries=entry_count)
+    started_at = time.perf_counter()
+    for _ in range(entry_count):
+        # Every entry shares "the" and "git", the worst case for an AND query
+        words = ["the", "git"] + rng.choices(vocabulary, k=TERMS_PER_ENTRY)
+        rng.shuffle(words)
+        history.add(" ".join(words).encode("utf-8"), "text/plain; charset=utf-8", "Bench")
+    elapsed = time.perf_counter() - started_at
+    return history, elapsed
+
+
+def time_query(history, query):
+    results = history.search(query)
+    started_at = time.perf_counter()
+    for _ in range(QUERY_REPEATS):
+        history.search(query)
+    elapsed_ms = (time.perf_counter() - started_at) / QUERY_REPEATS * 1000
+    return len(results), elapsed_ms
+
+
+def main():
+    entry_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(1)
+
+    tracemalloc.start()
+    history, insert_seconds = build_history(entry_count, rng)
+    traced_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    stats = history.stats()
+    print(f"Entries: {stats['entries']:,} (asked for {entry_count:,})")
+    print(f"Insert: {insert_seconds / entry_count * 1e6:.1f} us per entry")
+    print(
+        f"Index: {stats['terms']:,} terms, {stats['postings']:,} postings, "
+        f"{stats['text_bytes']:,} text bytes"
+    )
+    print(
+        f"Memory: ~{traced_bytes / 1e6:.0f} MB traced, index estimated at "
+        f"{stats['index_bytes'] / 1e6:.0f} MB + {stats['text_bytes'] / 1e6:.0f} MB text "
+        f"(budget {stats['max_index_bytes'] / 1e6:.0f} MB)"
+    )
+
+    queries = {
+        "rare": "w17",
+        "rare pair": "w17 w42",
+        "common": "the",
+        "common pair": "the git",
+        "common + rare": "the w17",
+        "no match": "nomatch",
+    }
+    for label, query in queries.items():
+        count, elapsed_ms = time_query(history, query)
+        print(f"Query {label:<14} {query!r:<12} {count:>3} results  {elapsed_ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
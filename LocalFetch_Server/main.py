@@ -11,15 +11,90 @@ import io
 import os
 import sys
 import subprocess
+import cProfile
+import pstats
+import functools
+import json
+import math
+import re
+import heapq
+import codecs
+import zlib
+import uuid
+import http.client
+from collections import Counter, OrderedDict, deque
+from urllib.parse import urlsplit, parse_qs
 
 # --- Configuration ---
 DEFAULT_HOST_NAME = "0.0.0.0"
 DEFAULT_PORT_NUMBER = 8000
+PORT_ENV_VAR = "LOCALFETCH_PORT"  # Overrides the port, e.g. to run several servers on one machine
+DEFAULT_PROFILE_REQUEST_COUNT = 10
+ADMIN_ADDRESSES = ("127.0.0.1", "::1")  # Only the server machine may use /profile
+HISTORY_MAX_ENTRIES = 100_000
+HISTORY_MAX_BYTES = 64 * 1024 * 1024  # Total text kept for past transfers
+# Caps the estimated memory of the index on top of the texts themselves (see
+# TransferHistory._index_bytes). At ~10 unique terms per text that is ~25,000 texts.
+HISTORY_MAX_INDEX_BYTES = 32 * 1024 * 1024
+HISTORY_INDEXED_BYTES = 64 * 1024  # Only the start of very long texts is searchable
+SEARCH_RESULT_LIMIT = 20
+SEARCH_CANDIDATE_LIMIT = 1000  # Only the newest matches are scored, keeps common terms fast
+DISPLAY_PAGE_BYTES = 64 * 1024  # Shared content is decoded and shown in pages of this size
+DISPLAY_MAX_PAGES = 4  # Pages kept in the display at once, older ones are dropped while scrolling
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+TEXT_LIKE_CONTENT_TYPES = (
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/x-sh",
+)
+# Sent by clients that don't label their body (e.g. `curl -d`), text if it decodes as UTF-8
+UNLABELED_CONTENT_TYPES = ("", "application/x-www-form-urlencoded")
+# Types served back as stored. Other text goes out as text/plain, anything else
+# as application/octet-stream, so a browser never renders shared content as a page.
+SAFE_CONTENT_TYPES = (
+    "text/plain",
+    "application/json",
+    "application/octet-stream",
+    "application/zip",
+    "application/gzip",
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "audio/mpeg",
+    "video/mp4",
+)
+MEDIA_TYPE_PATTERN = re.compile(r"[a-z0-9!#$&^_.+-]+/[a-z0-9!#$&^_.+-]+")
+CHARSET_PATTERN = re.compile(r"[A-Za-z0-9!#$%&'+^_`{}~.-]+")
+POST_MAX_BYTES = 64 * 1024 * 1024  # Largest body accepted by POST /text
+PEERS_CONFIG_FILE = "peers.cfg"  # "host:port" per line, "discover" enables LAN discovery
+REPLICATION_BATCH_DELAY = 0.05  # Updates arriving within this window are pushed once
+REPLICATION_RETRY_DELAY = 5.0  # First retry of a failed push, doubles per failure for that peer
+REPLICATION_MAX_RETRY_DELAY = 60.0
+REPLICATION_TIMEOUT = 5.0
+REPLICATION_COMPRESS_LEVEL = 6
+REPLICATION_MAX_BYTES = POST_MAX_BYTES  # Largest (decompressed) update accepted from a peer
+DISCOVERY_PORT = 8001
+DISCOVERY_INTERVAL = 5.0
+DISCOVERY_PEER_TIMEOUT = 3 * DISCOVERY_INTERVAL  # Silent discovered peers are dropped after this
 # ---------------------
 
 app_instance_ref = None
 
 
+def configured_port():
+    """The port from PORT_ENV_VAR if it is set and valid, DEFAULT_PORT_NUMBER otherwise."""
+    value = os.environ.get(PORT_ENV_VAR, "").strip()
+    if not value:
+        return DEFAULT_PORT_NUMBER
+    if value.isdigit() and 0 < int(value) < 65536:
+        return int(value)
+    print(f"Warning: Ignoring invalid {PORT_ENV_VAR}={value!r}, using {DEFAULT_PORT_NUMBER}")
+    return DEFAULT_PORT_NUMBER
+
+
 # =============================================================================
 # UI Configuration and Theme Management
 # =============================================================================
@@ -162,22 +237,765 @@ class Theme:
             )
 
 
+# =============================================================================
+# Content Helpers
+# =============================================================================
+def content_charset(content_type):
+    """Returns the charset parameter of a Content-Type, defaulting to UTF-8."""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"')
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def is_text_content_type(content_type):
+    media_type = media_type_of(content_type)
+    return media_type.startswith("text/") or media_type in TEXT_LIKE_CONTENT_TYPES
+
+
+def media_type_of(content_type):
+    return content_type.split(";")[0].strip().lower()
+
+
+def normalize_content_type(content_type):
+    """
+    Rebuilds a Content-Type from its media type and charset only, so other
+    parameters and anything smuggled into the header value are never stored.
+    """
+    media_type = media_type_of(content_type or "")
+    if not MEDIA_TYPE_PATTERN.fullmatch(media_type):
+        return DEFAULT_CONTENT_TYPE
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        charset = value.strip().strip('"')
+        if name.strip().lower() == "charset" and CHARSET_PATTERN.fullmatch(charset):
+            try:
+                codecs.lookup(charset)
+            except LookupError:
+                break
+            return f"{media_type}; charset={charset}"
+    return media_type
+
+
+def resolve_content_type(content_type, data):
+    """Content-Type to store for a POSTed body, guessing for unlabeled ones."""
+    content_type = (content_type or "").strip()
+    if media_type_of(content_type) not in UNLABELED_CONTENT_TYPES:
+        return normalize_content_type(content_type)
+    try:
+        bytes(data).decode("utf-8")
+    except UnicodeDecodeError:
+        return DEFAULT_CONTENT_TYPE
+    return TEXT_CONTENT_TYPE
+
+
+def served_content_type(content_type):
+    """Content-Type to send back to clients, never one a browser would render."""
+    if media_type_of(content_type) in SAFE_CONTENT_TYPES:
+        return content_type
+    if is_text_content_type(content_type):
+        return f"text/plain; charset={content_charset(content_type)}"
+    return DEFAULT_CONTENT_TYPE
+
+
+def content_preview(data, content_type, length=50):
+    """Short human readable description of shared content, used in log lines."""
+    if not is_text_content_type(content_type):
+        return f"<{content_type}, {len(data):,} bytes>"
+    # Decoding a few extra bytes covers multi-byte characters cut at the edge
+    text = bytes(data[: length * 4]).decode(content_charset(content_type), errors="replace")
+    return f"'{text[:length]}...'" if len(text) > length else f"'{text}'"
+
+
+# =============================================================================
+# Transfer History and Search
+# =============================================================================
+class TransferHistory:
+    """
+    Keeps past shared texts in a bounded store with an inverted index that is
+    updated incrementally as texts are added and evicted. Texts are kept as the
+    bytes that were received and are only decoded for indexing and snippets.
+    """
+
+    TOKEN_PATTERN = re.compile(r"\w+")
+    # Estimated index memory per entry, per term and per posting
+    ENTRY_BYTES = 480
+    TERM_BYTES = 250
+    POSTING_BYTES = 64  # Includes the slack dicts keep after evictions
+
+    def __init__(
+        self,
+        max_entries=HISTORY_MAX_ENTRIES,
+        max_bytes=HISTORY_MAX_BYTES,
+        max_index_bytes=HISTORY_MAX_INDEX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_index_bytes = max_index_bytes
+        self._entries = OrderedDict()  # id -> (timestamp, source, data, content type, indexed terms)
+        self._postings = {}  # term -> {id: term frequency}
+        self._next_id = 1
+        self._text_bytes = 0
+        self._posting_count = 0
+        self._lock = threading.Lock()
+
+    def _tokenize(self, text):
+        # Interned, so every entry's term tuple shares the posting keys instead of copies
+        return map(sys.intern, self.TOKEN_PATTERN.findall(text.lower()))
+
+    @staticmethod
+    def _indexed_text(data, content_type):
+        return bytes(data[:HISTORY_INDEXED_BYTES]).decode(
+            content_charset(content_type), errors="ignore"
+        )
+
+    def add(self, data, content_type, source):
+        term_counts = Counter(self._tokenize(self._indexed_text(data, content_type)))
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            # Counts live in the postings, the entry only needs its terms for eviction
+            self._entries[entry_id] = (
+                time.time(),
+                source,
+                data,
+                content_type,
+                tuple(term_counts),
+            )
+            self._text_bytes += len(data)
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, {})[entry_id] = count
+            self._posting_count += len(term_counts)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self._text_bytes > self.max_bytes
+                or self._index_bytes() > self.max_index_bytes
+            ):
+                self._evict_oldest()
+        return entry_id
+
+    def _evict_oldest(self):
+        entry_id, (_, _, data, _, terms) = self._entries.popitem(last=False)
+        self._text_bytes -= len(data)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[entry_id]
+            if not postings:
+                del self._postings[term]
+        self._posting_count -= len(terms)
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """
+        Returns entries containing every query term, ranked by TF-IDF with
+        newer entries winning ties. Only the newest SEARCH_CANDIDATE_LIMIT
+        matching entries are ranked.
+        """
+        terms = set(self._tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            posting_lists = [self._postings.get(term) for term in terms]
+            if not all(posting_lists):
+                return []
+            posting_lists.sort(key=len)
+            rarest, others = posting_lists[0], posting_lists[1:]
+            # Postings are in insertion order, so walking backwards visits newest first
+            candidates = []
+            for entry_id in reversed(rarest):
+                if all(entry_id in postings for postings in others):
+                    candidates.append(entry_id)
+                    if len(candidates) >= SEARCH_CANDIDATE_LIMIT:
+                        break
+            if not candidates:
+                return []
+
+            entry_count = len(self._entries)
+            idfs = [math.log(1 + entry_count / len(postings)) for postings in posting_lists]
+            scored = (
+                (
+                    sum(
+                        math.log(1 + postings[entry_id]) * idf
+                        for postings, idf in zip(posting_lists, idfs)
+                    ),
+                    entry_id,
+                )
+                for entry_id in candidates
+            )
+            top = heapq.nlargest(limit, scored)
+
+            results = []
+            for score, entry_id in top:
+                timestamp, source, data, content_type, _ = self._entries[entry_id]
+                results.append(
+                    {
+                        "id": entry_id,
+                        "time": timestamp,
+                        "source": source,
+                        "score": round(score, 4),
+                        "content_type": content_type,
+                        "length": len(data),
+                        "snippet": self._snippet(
+                            self._indexed_text(data, content_type), terms
+                        ),
+                    }
+                )
+        return results
+
+    def _snippet(self, text, terms, width=120):
+        lowered = text.lower()
+        hit = min((i for i in (lowered.find(term) for term in terms) if i >= 0), default=0)
+        start = max(0, hit - width // 4)
+        return text[start : start + width]
+
+    def _index_bytes(self):
+        # Callers hold _lock. Fitted with tracemalloc on CPython 3.11, texts not included.
+        return (
+            len(self._entries) * self.ENTRY_BYTES
+            + len(self._postings) * self.TERM_BYTES
+            + self._posting_count * self.POSTING_BYTES
+        )
+
+    def stats(self):
+        """Approximate memory held by the store and index."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "text_bytes": self._text_bytes,
+                "terms": len(self._postings),
+                "postings": self._posting_count,
+                "index_bytes": self._index_bytes(),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "max_index_bytes": self.max_index_bytes,
+            }
+
+
+# =============================================================================
+# Peer Replication
+# =============================================================================
+class Replicator:
+    """
+    Pushes shared content to peer LocalFetch servers and pulls their latest
+    content when they are first seen. Every update carries a
+    (version, timestamp, node id) stamp and the highest stamp wins.
+    """
+
+    STAMP_HEADERS = ("X-LocalFetch-Version", "X-LocalFetch-Timestamp", "X-LocalFetch-Origin")
+    CONTENT_TYPE_HEADER = "X-LocalFetch-Content-Type"
+
+    def __init__(self, peers=(), discover=False, log=print):
+        self.node_id = uuid.uuid4().hex[:12]
+        self.port = configured_port()
+        self.discover = discover
+        self.log = log
+        self._apply = None
+        self._clock = 0
+        self._peers = {peer: self._new_peer_state(configured=True) for peer in peers}
+        self._peer_addresses = {}  # peer -> IP addresses its host resolved to
+        self._unreachable = set()
+        self._latest = None  # (data, content type, stamp)
+        self._encoded = None  # (stamp, compressed body, headers) of the last push
+        self._running = False
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config_file(cls, log=print):
+        """Reads peers from PEERS_CONFIG_FILE, replication stays off without it."""
+        peers, discover = [], False
+        try:
+            with open(PEERS_CONFIG_FILE, "r") as f:
+                for line in f:
+                    line = line.split("#")[0].strip()
+                    if line == "discover":
+                        discover = True
+                    elif line:
+                        peers.append(line)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not read peers file '{PEERS_CONFIG_FILE}': {e}")
+        return cls(peers, discover, log)
+
+    @property
+    def enabled(self):
+        return bool(self._peers) or self.discover
+
+    def initial_stamp(self):
+        return (0, 0.0, self.node_id)
+
+    def next_stamp(self):
+        with self._condition:
+            self._clock += 1
+            return (self._clock, time.time(), self.node_id)
+
+    def observe(self, stamp):
+        """Keeps local versions ahead of everything seen from peers."""
+        with self._condition:
+            self._clock = max(self._clock, stamp[0])
+
+    @classmethod
+    def stamp_headers(cls, stamp):
+        return dict(zip(cls.STAMP_HEADERS, (str(stamp[0]), repr(stamp[1]), stamp[2])))
+
+    @classmethod
+    def stamp_from_headers(cls, headers):
+        version, timestamp, origin = (headers[name] for name in cls.STAMP_HEADERS)
+        version, timestamp = int(version), float(timestamp)
+        if version < 0 or not math.isfinite(timestamp):
+            raise ValueError("Invalid version stamp")
+        return (version, timestamp, origin)
+
+    @staticmethod
+    def decompress(body):
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(body, REPLICATION_MAX_BYTES)
+        if decompressor.unconsumed_tail:
+            raise ValueError("Replicated content too large")
+        return data + decompressor.flush()
+
+    def start(self, apply):
+        """`apply(data, content_type, stamp, peer)` stores content received from a peer."""
+        self._apply = apply
+        with self._condition:
+            self._running = True
+            peers = list(self._peers)
+        threading.Thread(target=self._send_loop, daemon=True).start()
+        if self.discover:
+            threading.Thread(target=self._discovery_loop, daemon=True).start()
+        for peer in peers:
+            threading.Thread(target=self._pull_from, args=(peer,), daemon=True).start()
+        self.log(
+            f"Replication started (node {self.node_id}, peers: {', '.join(peers) or 'none yet'}"
+            f"{', discovery on' if self.discover else ''})."
+        )
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    @staticmethod
+    def _new_peer_state(configured):
+        return {
+            "acked": None,  # Highest stamp the peer has confirmed
+            "pushing": False,  # At most one push in flight per peer
+            "failures": 0,
+            "next_retry_at": 0.0,  # time.monotonic() before which the peer is skipped
+            "configured": configured,  # Discovered peers are dropped once they go quiet
+            "last_seen": time.monotonic(),
+        }
+
+    def add_peer(self, peer):
+        with self._condition:
+            if peer in self._peers:
+                self._peers[peer]["last_seen"] = time.monotonic()
+                return
+            self._peers[peer] = self._new_peer_state(configured=False)
+            self._condition.notify_all()
+        self.log(f"Discovered peer {peer}.")
+        threading.Thread(target=self._pull_from, args=(peer,), daemon=True).start()
+
+    def is_peer_address(self, address):
+        """Only configured or discovered peers may push content to this server."""
+        with self._condition:
+            return any(address in addresses for addresses in self._peer_addresses.values())
+
+    def publish(self, data, content_type, stamp, source=None):
+        """
+        Queues content for every peer that doesn't have it yet. Content applied
+        from a peer is published again with that peer as `source`, so updates
+        travel across chains and stars too. The stamp ends the loop: peers
+        ignore what they already have and only forward what they applied.
+        """
+        with self._condition:
+            if source in self._peers:
+                state = self._peers[source]
+                if state["acked"] is None or state["acked"] < stamp:
+                    state["acked"] = stamp  # The sender has it, don't echo it back
+            if self._latest is None or self._latest[2] < stamp:
+                self._latest = (data, content_type, stamp)
+                self._condition.notify_all()
+
+    def _is_outdated(self, state):
+        return state["acked"] is None or state["acked"] < self._latest[2]
+
+    def _due_peers(self, now):
+        # Callers hold _condition
+        if self._latest is None:
+            return []
+        return [
+            peer
+            for peer, state in self._peers.items()
+            if self._is_outdated(state)
+            and not state["pushing"]
+            and state["next_retry_at"] <= now
+        ]
+
+    def _seconds_until_retry(self, now):
+        # Callers hold _condition. None means nothing is waiting for a retry.
+        if self._latest is None:
+            return None
+        retries = [
+            state["next_retry_at"] - now
+            for state in self._peers.values()
+            if self._is_outdated(state) and not state["pushing"]
+        ]
+        return max(0.0, min(retries)) if retries else None
+
+    def _encode(self, data, content_type, stamp):
+        """Compresses each version once, however many peers it goes to."""
+        if self._encoded is None or self._encoded[0] != stamp:
+            body = zlib.compress(data, REPLICATION_COMPRESS_LEVEL)
+            headers = {
+                "Content-Type": content_type,
+                "Content-Encoding": "deflate",
+                "X-LocalFetch-Port": str(self.port),  # Tells the receiver which peer we are
+                **self.stamp_headers(stamp),
+            }
+            self._encoded = (stamp, body, headers)
+        return self._encoded[1], self._encoded[2]
+
+    def _send_loop(self):
+        """Hands every outdated peer to its own push thread, so a dead peer only delays itself."""
+        while True:
+            with self._condition:
+                while self._running and not self._due_peers(time.monotonic()):
+                    self._condition.wait(self._seconds_until_retry(time.monotonic()))
+                if not self._running:
+                    return
+            time.sleep(REPLICATION_BATCH_DELAY)  # Let a burst of updates collapse into one push
+
+            with self._condition:
+                data, content_type, stamp = self._latest
+                targets = self._due_peers(time.monotonic())
+                for peer in targets:
+                    self._peers[peer]["pushing"] = True
+            body, headers = self._encode(data, content_type, stamp)
+            for peer in targets:
+                threading.Thread(
+                    target=self._push_to,
+                    args=(peer, body, headers, stamp, len(data)),
+                    daemon=True,
+                ).start()
+
+    def _push_to(self, peer, body, headers, stamp, size):
+        started_at = time.perf_counter()
+        delivered = self._push(peer, body, headers)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        expired = False
+        with self._condition:
+            state = self._peers[peer]
+            state["pushing"] = False
+            if delivered:
+                state["failures"] = 0
+                state["next_retry_at"] = 0.0
+                if state["acked"] is None or state["acked"] < stamp:
+                    state["acked"] = stamp
+            else:
+                state["failures"] += 1
+                delay = REPLICATION_RETRY_DELAY * 2 ** (state["failures"] - 1)
+                state["next_retry_at"] = time.monotonic() + min(delay, REPLICATION_MAX_RETRY_DELAY)
+                expired = (
+                    not state["configured"]
+                    and time.monotonic() - state["last_seen"] > DISCOVERY_PEER_TIMEOUT
+                )
+                if expired:
+                    del self._peers[peer]
+                    self._peer_addresses.pop(peer, None)
+                    self._unreachable.discard(peer)
+            self._condition.notify_all()
+        if delivered:
+            self.log(
+                f"Replicated v{stamp[0]} ({size:,} bytes, {len(body):,} compressed) "
+                f"to {peer} in {elapsed_ms:.1f} ms."
+            )
+        elif expired:
+            self.log(f"Dropped discovered peer {peer}, it stopped announcing itself.")
+
+    def _resolve(self, peer, host):
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+        except OSError:
+            return  # Keep the last known addresses, _request reports the failure
+        with self._condition:
+            self._peer_addresses[peer] = addresses
+
+    def _request(self, peer, method, body=None, headers=None):
+        host, _, port = peer.rpartition(":")
+        self._resolve(peer, host)  # Peers are accepted by address, hostnames may move
+        connection = http.client.HTTPConnection(host, int(port), timeout=REPLICATION_TIMEOUT)
+        try:
+            connection.request(method, "/replicate", body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def _set_reachable(self, peer, reachable, error=None):
+        if reachable and peer in self._unreachable:
+            self._unreachable.discard(peer)
+            self.log(f"Peer {peer} is reachable again.")
+        elif not reachable and peer not in self._unreachable:
+            self._unreachable.add(peer)  # Only logged once until it comes back
+            self.log(f"Peer {peer} unreachable, will retry: {error}")
+
+    def _push(self, peer, body, headers):
+        try:
+            response, _ = self._request(peer, "POST", body, headers)
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status}")
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            self._set_reachable(peer, False, e)
+            return False
+        self._set_reachable(peer, True)
+        return True
+
+    def _pull_from(self, peer):
+        try:
+            response, body = self._request(peer, "GET")
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status}")
+            stamp = self.stamp_from_headers(response.headers)
+            data = self.decompress(body)
+        except (OSError, ValueError, KeyError, zlib.error, http.client.HTTPException) as e:
+            self._set_reachable(peer, False, e)
+            return
+        self._set_reachable(peer, True)
+        self.observe(stamp)
+        content_type = normalize_content_type(response.headers.get(self.CONTENT_TYPE_HEADER))
+        self._apply(data, content_type, stamp, peer)
+
+    def _discovery_loop(self):
+        """Broadcasts this server's port and adds every other server heard on the LAN."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, "SO_REUSEPORT"):  # Lets several servers share one machine
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.bind(("", DISCOVERY_PORT))
+        except OSError as e:
+            self.log(f"Peer discovery unavailable: {e}")
+            sock.close()
+            return
+        sock.settimeout(DISCOVERY_INTERVAL)
+
+        beacon = f"LOCALFETCH {self.node_id} {self.port}".encode("ascii")
+        next_beacon = 0.0
+        while self._running:
+            if time.monotonic() >= next_beacon:
+                try:
+                    sock.sendto(beacon, ("<broadcast>", DISCOVERY_PORT))
+                except OSError:
+                    pass
+                next_beacon = time.monotonic() + DISCOVERY_INTERVAL
+            try:
+                message, (address, _) = sock.recvfrom(256)
+                magic, node_id, port = message.decode("ascii").split()
+            except (socket.timeout, ValueError, UnicodeDecodeError):
+                continue
+            if magic == "LOCALFETCH" and node_id != self.node_id:
+                self.add_peer(f"{address}:{int(port)}")
+        sock.close()
+
+
+# =============================================================================
+# Shared Content
+# =============================================================================
+class SharedContent:
+    """
+    The content every client and peer sees: bytes, their Content-Type, a
+    version counter and a replication stamp. Thread safe and free of Tk.
+    `on_change(log_msg)` is called after every update.
+    """
+
+    def __init__(self, data, content_type, replicator, history, on_change=None):
+        self.replicator = replicator
+        self.history = history
+        self.on_change = on_change or (lambda log_msg: None)
+        self.version = 0  # Bumped on every update, lets the display skip redraws
+        self._data = data
+        self._content_type = content_type
+        self._stamp = replicator.initial_stamp()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Returns the shared bytes together with their Content-Type."""
+        with self._lock:
+            return self._data, self._content_type
+
+    def get_versioned(self):
+        """Returns the shared bytes, their Content-Type and an ETag for this version."""
+        with self._lock:
+            # The node id keeps ETags from colliding across restarts and servers
+            etag = f'"{self.replicator.node_id}-{self.version}"'
+            return self._data, self._content_type, etag
+
+    def get_stamped(self):
+        with self._lock:
+            return self._data, self._content_type, self._stamp
+
+    def _set(self, data, content_type, stamp, source, log_msg):
+        # Callers hold _lock
+        self._data, self._content_type = data, content_type
+        self._stamp = stamp
+        self.version += 1
+        if is_text_content_type(content_type):
+            self.history.add(data, content_type, source)
+        self.on_change(log_msg)
+
+    def update(self, data, content_type, source):
+        log_msg = f"{source} updated content to: {content_preview(data, content_type)}"
+        with self._lock:
+            stamp = self.replicator.next_stamp()
+            self._set(data, content_type, stamp, source, log_msg)
+        if self.replicator.enabled:
+            self.replicator.publish(data, content_type, stamp)
+
+    def apply_replicated(self, data, content_type, stamp, peer):
+        """Last writer wins: older content is ignored, newer content is forwarded."""
+        if stamp[0] == 0:
+            return False  # A peer's startup text, nobody has written anything there yet
+        self.replicator.observe(stamp)
+        with self._lock:
+            if stamp <= self._stamp:
+                return False
+            lag_ms = max(0.0, time.time() - stamp[1]) * 1000
+            log_msg = (
+                f"Peer {peer} updated content to: {content_preview(data, content_type)} "
+                f"(v{stamp[0]}, lag: {lag_ms:.1f} ms)"
+            )
+            self._set(data, content_type, stamp, f"Peer {peer}", log_msg)
+        self.replicator.publish(data, content_type, stamp, source=peer)  # Forward it
+        return True
+
+
+# =============================================================================
+# Request Profiling
+# =============================================================================
+class RequestProfiler:
+    """
+    Runs cProfile over a limited number of upcoming requests.
+    While not armed, handlers only pay for a single integer check.
+    """
+
+    def __init__(self):
+        self.remaining = 0
+        self._profile = None
+        self._profiled_count = 0
+        self._skipped_count = 0
+        self._lock = threading.Lock()
+
+    def arm(self, request_count):
+        """Starts a fresh profile covering the next `request_count` requests."""
+        with self._lock:
+            self._profile = cProfile.Profile()
+            self._profiled_count = 0
+            self._skipped_count = 0
+            self.remaining = request_count
+
+    def run(self, func, *args):
+        with self._lock:
+            if self.remaining <= 0:
+                profile = None
+            else:
+                self.remaining -= 1
+                self._profiled_count += 1
+                profile = self._profile
+        if profile is None:
+            return func(*args)
+        try:
+            profile.enable()
+        except ValueError:  # Another profiler (e.g. a debugger's) owns the hook
+            with self._lock:
+                self._profiled_count -= 1
+                self._skipped_count += 1
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+
+    def report(self, limit=40):
+        """Returns the aggregated stats, sorted by cumulative time, as text."""
+        with self._lock:
+            if self._profile is None:
+                return "Profiler has not been armed yet."
+            header = f"Profiled requests: {self._profiled_count}, still pending: {self.remaining}\n"
+            if self._skipped_count:
+                header += f"Not profiled (another profiler was active): {self._skipped_count}\n"
+            if sys.version_info >= (3, 12):
+                # cProfile hooks sys.monitoring there, which sees every thread
+                header += (
+                    "Note: stats cover all threads (GUI, replication) while requests ran.\n"
+                )
+            stream = io.StringIO()
+            try:
+                stats = pstats.Stats(self._profile, stream=stream)
+            except TypeError:  # No request has been profiled yet
+                return header
+            stats.sort_stats("cumulative").print_stats(limit)
+        return header + stream.getvalue()
+
+
+def profiled(handler_method):
+    """Routes a request through the app's profiler while it is armed."""
+
+    @functools.wraps(handler_method)
+    def wrapper(self):
+        app = app_instance_ref
+        if app and app.profiler.remaining and self.path != "/profile":
+            return app.profiler.run(handler_method, self)
+        return handler_method(self)
+
+    return wrapper
+
+
 # =============================================================================
 # Server Handler
 # =============================================================================
 class LocalFetchHandler(BaseHTTPRequestHandler):
+    def parse_request(self):
+        # Header parsing happens in here, so this is where a request's clock starts
+        self._request_start = time.perf_counter()
+        self._phase_timings = []
+        parsed = super().parse_request()
+        self._add_phase_timing("parse", self._request_start)
+        return parsed
+
+    def _add_phase_timing(self, name, started_at):
+        self._phase_timings.append((name, time.perf_counter() - started_at))
+
+    def _send_server_timing_header(self):
+        """Reports the phases measured so far, in milliseconds."""
+        metrics = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self._phase_timings]
+        total = time.perf_counter() - self._request_start
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        self.send_header("Server-Timing", ", ".join(metrics))
+        self.send_header("Timing-Allow-Origin", "*")
+
     def _send_cors_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         self.send_header(
-            "Access-Control-Allow-Headers", "X-Requested-With, Content-Type"
+            "Access-Control-Allow-Headers",
+            "X-Requested-With, Content-Type, If-None-Match",
         )
+        self.send_header("Access-Control-Expose-Headers", "Server-Timing, ETag")
 
     def do_OPTIONS(self):
         self.send_response(200)
         self._send_cors_headers()
         self.end_headers()
 
+    @profiled
     def do_GET(self):
         global app_instance_ref
         if not app_instance_ref:
@@ -189,18 +1007,39 @@ class LocalFetchHandler(BaseHTTPRequestHandler):
             return
 
         if self.path == "/text":
-            current_text = app_instance_ref.get_shared_text()
-            encoded_body = current_text.encode("utf-8")
+            content, content_type, etag = app_instance_ref.content.get_versioned()
+
+            if self.headers.get("If-None-Match") == etag:
+                # Polling clients already have this version, skip the body
+                self.send_response(304)
+                self._send_cors_headers()
+                self.send_header("ETag", etag)
+                self.end_headers()
+                app_instance_ref.log_to_gui(
+                    f"GET /text from {self.client_address[0]}: Sent 304 (not modified)"
+                )
+                return
 
             self.send_response(200)
             self._send_cors_headers()
-            self.send_header("Content-type", "text/plain; charset=utf-8")
-            self.send_header("Content-Length", str(len(encoded_body)))
+            self._send_server_timing_header()
+            self.send_header("ETag", etag)
+            self.send_header("Content-type", served_content_type(content_type))
+            self.send_header("X-Content-Type-Options", "nosniff")
+            self.send_header("Content-Length", str(len(content)))
             self.end_headers()
-            self.wfile.write(encoded_body)
+            started_at = time.perf_counter()
+            self.wfile.write(memoryview(content))
+            write_ms = (time.perf_counter() - started_at) * 1000
             app_instance_ref.log_to_gui(
-                f"GET /text from {self.client_address[0]}: Sent '{current_text}' (Length: {len(encoded_body)})"
+                f"GET /text from {self.client_address[0]}: Sent {content_preview(content, content_type)} (Length: {len(content)}, write: {write_ms:.1f} ms)"
             )
+        elif self.path == "/profile":
+            self._handle_profile_report()
+        elif urlsplit(self.path).path == "/search":
+            self._handle_search()
+        elif self.path == "/replicate" and app_instance_ref.replicator.enabled:
+            self._handle_replicate_pull()
         else:
             error_message_bytes = b"Not Found"
             self.send_response(404)
@@ -213,6 +1052,7 @@ class LocalFetchHandler(BaseHTTPRequestHandler):
                 f"GET {self.path} from {self.client_address[0]}: Sent 404 (Length: {len(error_message_bytes)})"
             )
 
+    @profiled
     def do_POST(self):
         global app_instance_ref
         if not app_instance_ref:
@@ -226,15 +1066,26 @@ class LocalFetchHandler(BaseHTTPRequestHandler):
         if self.path == "/text":
             try:
                 content_length = int(self.headers["Content-Length"])
-                if content_length > 1024 * 1024:  # Limit POST size to 1MB
+                if content_length > POST_MAX_BYTES:
                     raise ValueError("Content too large")
+                started_at = time.perf_counter()
                 post_data = self.rfile.read(content_length)
-                received_text = post_data.decode("utf-8")
-                app_instance_ref.update_shared_text(received_text, from_client=True)
-
-                success_message_bytes = b"Text received successfully!"
+                self._add_phase_timing("read", started_at)
+                content_type = resolve_content_type(
+                    self.headers.get("Content-Type"), post_data
+                )
+                started_at = time.perf_counter()
+                app_instance_ref.content.update(post_data, content_type, "Client")
+                self._add_phase_timing("update", started_at)
+
+                success_message_bytes = (
+                    b"Text received successfully!"
+                    if is_text_content_type(content_type)
+                    else b"Content received successfully!"
+                )
                 self.send_response(200)
                 self._send_cors_headers()
+                self._send_server_timing_header()
                 self.send_header("Content-type", "text/plain; charset=utf-8")
                 self.send_header("Content-Length", str(len(success_message_bytes)))
                 self.end_headers()
@@ -248,6 +1099,10 @@ class LocalFetchHandler(BaseHTTPRequestHandler):
                 self.send_header("Content-Length", str(len(error_response_bytes)))
                 self.end_headers()
                 self.wfile.write(error_response_bytes)
+        elif self.path == "/profile":
+            self._handle_profile_arm()
+        elif self.path == "/replicate" and app_instance_ref.replicator.enabled:
+            self._handle_replicate_push()
         else:
             error_message_bytes = b"Not Found"
             self.send_response(404)
@@ -260,6 +1115,307 @@ class LocalFetchHandler(BaseHTTPRequestHandler):
                 f"POST {self.path} from {self.client_address[0]}: Sent 404 (Length: {len(error_message_bytes)})"
             )
 
+    def _handle_search(self):
+        """GET /search?q=... returns ranked past transfers as JSON."""
+        started_at = time.perf_counter()
+        query = parse_qs(urlsplit(self.path).query).get("q", [""])[0]
+        results = app_instance_ref.history.search(query)
+        took_ms = (time.perf_counter() - started_at) * 1000
+        self._add_phase_timing("search", started_at)
+
+        body_bytes = json.dumps(
+            {
+                "query": query,
+                "took_ms": round(took_ms, 3),
+                "results": results,
+                "index": app_instance_ref.history.stats(),
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self._send_cors_headers()
+        self._send_server_timing_header()
+        self.send_header("Content-type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body_bytes)))
+        self.end_headers()
+        self.wfile.write(body_bytes)
+        app_instance_ref.log_to_gui(
+            f"GET /search from {self.client_address[0]}: '{query}' matched {len(results)} ({took_ms:.1f} ms)"
+        )
+
+    def _handle_replicate_push(self):
+        """POST /replicate carries a compressed, stamped update from a peer."""
+        if not self._is_peer_request():
+            return
+        peer = self.client_address[0]
+        port = self.headers.get("X-LocalFetch-Port", "")
+        if port.isdigit():
+            peer = f"{peer}:{int(port)}"
+        try:
+            content_length = int(self.headers["Content-Length"])
+            if content_length > REPLICATION_MAX_BYTES:
+                raise ValueError("Content too large")
+            stamp = Replicator.stamp_from_headers(self.headers)
+            content_type = normalize_content_type(self.headers.get("Content-Type"))
+            body = self.rfile.read(content_length)
+            data = Replicator.decompress(body)
+        except (TypeError, ValueError, KeyError, zlib.error) as e:
+            app_instance_ref.log_to_gui(f"Error processing replication from {peer}: {e}")
+            error_response_bytes = b"Error processing request"
+            self.send_response(400)
+            self.send_header("Content-type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(error_response_bytes)))
+            self.end_headers()
+            self.wfile.write(error_response_bytes)
+            return
+
+        applied = app_instance_ref.content.apply_replicated(data, content_type, stamp, peer)
+        response_bytes = b"applied" if applied else b"stale"
+        self.send_response(200)
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(response_bytes)))
+        self.end_headers()
+        self.wfile.write(response_bytes)
+
+    def _handle_replicate_pull(self):
+        """GET /replicate returns the current content for a peer that just started."""
+        if not self._is_peer_request():
+            return
+        content, content_type, stamp = app_instance_ref.content.get_stamped()
+        body = zlib.compress(content, REPLICATION_COMPRESS_LEVEL)
+        self.send_response(200)
+        self.send_header("Content-type", served_content_type(content_type))
+        self.send_header("X-Content-Type-Options", "nosniff")
+        # The stored type travels separately so peers keep it unchanged
+        self.send_header(Replicator.CONTENT_TYPE_HEADER, content_type)
+        self.send_header("Content-Encoding", "deflate")
+        for name, value in Replicator.stamp_headers(stamp).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _is_peer_request(self):
+        if app_instance_ref.replicator.is_peer_address(self.client_address[0]):
+            return True
+        error_message_bytes = b"Forbidden"
+        self.send_response(403)
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(error_message_bytes)))
+        self.end_headers()
+        self.wfile.write(error_message_bytes)
+        app_instance_ref.log_to_gui(
+            f"{self.command} {self.path} from {self.client_address[0]}: Sent 403 (not a peer)"
+        )
+        return False
+
+    def _is_admin_request(self):
+        if self.client_address[0] in ADMIN_ADDRESSES:
+            return True
+        error_message_bytes = b"Forbidden"
+        self.send_response(403)
+        self._send_cors_headers()
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(error_message_bytes)))
+        self.end_headers()
+        self.wfile.write(error_message_bytes)
+        app_instance_ref.log_to_gui(
+            f"{self.command} {self.path} from {self.client_address[0]}: Sent 403 (admin only)"
+        )
+        return False
+
+    def _handle_profile_arm(self):
+        """POST /profile with an optional request count as the body."""
+        if not self._is_admin_request():
+            return
+        try:
+            content_length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(content_length).decode("utf-8").strip()
+            request_count = int(body) if body else DEFAULT_PROFILE_REQUEST_COUNT
+            if request_count <= 0:
+                raise ValueError("Request count must be positive")
+        except ValueError as e:
+            app_instance_ref.log_to_gui(f"Error processing POST /profile: {e}")
+            error_response_bytes = b"Error processing request"
+            self.send_response(400)
+            self._send_cors_headers()
+            self.send_header("Content-type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(error_response_bytes)))
+            self.end_headers()
+            self.wfile.write(error_response_bytes)
+            return
+
+        app_instance_ref.profiler.arm(request_count)
+        success_message_bytes = f"Profiling the next {request_count} requests.".encode("utf-8")
+        self.send_response(200)
+        self._send_cors_headers()
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(success_message_bytes)))
+        self.end_headers()
+        self.wfile.write(success_message_bytes)
+        app_instance_ref.log_to_gui(f"Profiler armed for the next {request_count} requests.")
+
+    def _handle_profile_report(self):
+        """GET /profile returns the stats collected since the last arm."""
+        if not self._is_admin_request():
+            return
+        report_bytes = app_instance_ref.profiler.report().encode("utf-8")
+        self.send_response(200)
+        self._send_cors_headers()
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(report_bytes)))
+        self.end_headers()
+        self.wfile.write(report_bytes)
+
+
+# =============================================================================
+# Shared Text Display
+# =============================================================================
+class ContentPages:
+    """Splits shared bytes into pages that each start on a whole character."""
+
+    def __init__(self, data=b"", charset="utf-8"):
+        self.data = memoryview(data)
+        self.charset = charset
+
+    def __len__(self):
+        return -(-len(self.data) // DISPLAY_PAGE_BYTES)
+
+    def start(self, page_index):
+        data = self.data
+        offset = min(page_index * DISPLAY_PAGE_BYTES, len(data))
+        if self.charset == "utf-8":
+            # Move past continuation bytes so every page starts on a whole character
+            while offset < len(data) and (data[offset] & 0xC0) == 0x80:
+                offset += 1
+        return offset
+
+    def decode(self, page_index):
+        start, end = self.start(page_index), self.start(page_index + 1)
+        return str(self.data[start:end], self.charset, "replace")
+
+
+class SharedTextView:
+    """
+    Shows SharedContent in a ScrolledText. The widget holds a window of at
+    most DISPLAY_MAX_PAGES pages that slides over the content as the user
+    scrolls. Non-text content only gets a placeholder.
+    """
+
+    def __init__(self, root, frame, text_widget, content):
+        self.root = root
+        self.frame = frame
+        self.text_widget = text_widget
+        self.content = content
+        self._pages = ContentPages()
+        self._shown_pages = deque()  # (page index, Tk characters inserted) per shown page
+        self._shown_version = -1
+        self._page_in_scheduled = False
+        text_widget.config(yscrollcommand=self._on_scroll)
+
+    def refresh(self):
+        """Shows the first page of the current content, unless it is already shown."""
+        if self.content.version == self._shown_version:
+            return  # Several queued updates may have already been drawn at once
+        self._shown_version = self.content.version
+        data, content_type = self.content.get()
+
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.config(state=tk.DISABLED)
+        self._shown_pages.clear()
+        self.frame.config(text="Shared Text")
+
+        if not is_text_content_type(content_type):
+            self._pages = ContentPages()
+            self.text_widget.config(state=tk.NORMAL)
+            self.text_widget.insert(
+                tk.END, f"[Binary content: {content_type}, {len(data):,} bytes]"
+            )
+            self.text_widget.config(state=tk.DISABLED)
+            return
+
+        self._pages = ContentPages(data, content_charset(content_type))
+        self._append_page()
+
+    def _insert_page_text(self, index, text):
+        """
+        Inserts `text` at `index` and returns its length in Tk's character
+        units. Tcl 8.6 counts characters outside the BMP (e.g. emoji) twice,
+        so len(text) can't be used for index math.
+        """
+        widget = self.text_widget
+        widget.mark_set("page_start", index)
+        widget.mark_gravity("page_start", tk.LEFT)
+        widget.mark_set("page_end", index)
+        widget.mark_gravity("page_end", tk.RIGHT)
+        widget.insert(index, text)
+        counted = widget.count("page_start", "page_end", "chars")
+        return counted[0] if counted else 0
+
+    def _first_visible_char(self):
+        counted = self.text_widget.count("1.0", "@0,0", "chars")
+        return counted[0] if counted else 0
+
+    def _append_page(self):
+        self._page_in_scheduled = False
+        shown = self._shown_pages
+        page_index = shown[-1][0] + 1 if shown else 0
+        if page_index >= len(self._pages):
+            return
+        text = self._pages.decode(page_index)
+
+        self.text_widget.config(state=tk.NORMAL)
+        shown.append((page_index, self._insert_page_text("end - 1 chars", text)))
+        if len(shown) > DISPLAY_MAX_PAGES:
+            # Drop the top page and keep the view on the same characters
+            top_char = self._first_visible_char()
+            _, dropped_chars = shown.popleft()
+            self.text_widget.delete("1.0", f"1.0 + {dropped_chars} chars")
+            self.text_widget.yview(f"1.0 + {max(0, top_char - dropped_chars)} chars")
+        self.text_widget.config(state=tk.DISABLED)
+        self._update_frame_title()
+
+    def _prepend_page(self):
+        self._page_in_scheduled = False
+        shown = self._shown_pages
+        if not shown or shown[0][0] == 0:
+            return
+        page_index = shown[0][0] - 1
+        text = self._pages.decode(page_index)
+
+        top_char = self._first_visible_char()
+        self.text_widget.config(state=tk.NORMAL)
+        inserted_chars = self._insert_page_text("1.0", text)
+        shown.appendleft((page_index, inserted_chars))
+        if len(shown) > DISPLAY_MAX_PAGES:
+            _, dropped_chars = shown.pop()
+            self.text_widget.delete(f"end - {dropped_chars + 1} chars", "end - 1 chars")
+        self.text_widget.yview(f"1.0 + {top_char + inserted_chars} chars")
+        self.text_widget.config(state=tk.DISABLED)
+        self._update_frame_title()
+
+    def _update_frame_title(self):
+        total = len(self._pages.data)
+        start = self._pages.start(self._shown_pages[0][0])
+        end = self._pages.start(self._shown_pages[-1][0] + 1)
+        if start == 0 and end >= total:
+            self.frame.config(text="Shared Text")
+        else:
+            self.frame.config(
+                text=f"Shared Text (showing bytes {start:,}-{end:,} of {total:,})"
+            )
+
+    def _on_scroll(self, first, last):
+        self.text_widget.vbar.set(first, last)
+        if self._page_in_scheduled or not self._shown_pages:
+            return
+        if float(last) > 0.9 and self._shown_pages[-1][0] + 1 < len(self._pages):
+            self._page_in_scheduled = True
+            self.root.after_idle(self._append_page)
+        elif float(first) < 0.1 and self._shown_pages[0][0] > 0:
+            self._page_in_scheduled = True
+            self.root.after_idle(self._prepend_page)
+
 
 # =============================================================================
 # Main Application Class
@@ -268,14 +1424,23 @@ class LocalFetchServerApp:
     def __init__(self, root_window: tk.Tk):
         # --- Core App State ---
         self.root: tk.Tk = root_window
-        self.shared_text_data = "Hello from the Python server GUI!"
         self.server_thread = None
         self.httpd = None
-        self.running_port = DEFAULT_PORT_NUMBER
+        self.running_port = configured_port()
         self.preferred_ip = "N/A"
         self.all_ips = []
         self.gui_queue = queue.Queue()
         self.qr_image_tk = None
+        self.profiler = RequestProfiler()
+        self.history = TransferHistory()
+        self.replicator = Replicator.from_config_file(log=self.log_to_gui)
+        self.content = SharedContent(
+            b"Hello from the Python server GUI!",
+            TEXT_CONTENT_TYPE,
+            self.replicator,
+            self.history,
+            on_change=self._on_shared_content_change,
+        )
 
         # --- UI Styling ---
         self.config = Config()
@@ -285,7 +1450,7 @@ class LocalFetchServerApp:
         self._configure_root_window()
         self._apply_theme()
         self._setup_gui()
-        self.update_shared_text_display()
+        self.shared_text_view.refresh()
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         self._process_gui_queue()
@@ -398,7 +1563,7 @@ class LocalFetchServerApp:
         self.theme_selector.pack(side=tk.LEFT)
 
     def _create_shared_text_frame(self):
-        shared_text_frame = ttk.LabelFrame(
+        self.shared_text_frame = shared_text_frame = ttk.LabelFrame(
             self.root,
             text="Shared Text",
             padding=(self.config.PAD_X, self.config.PAD_Y),
@@ -427,6 +1592,9 @@ class LocalFetchServerApp:
         self.shared_text_display.grid(
             row=0, column=0, columnspan=2, sticky="nsew", pady=(0, self.config.PAD_Y)
         )
+        self.shared_text_view = SharedTextView(
+            self.root, shared_text_frame, self.shared_text_display, self.content
+        )
 
         self.gui_text_input = ttk.Entry(
             shared_text_frame,
@@ -508,7 +1676,7 @@ class LocalFetchServerApp:
         ttk.Label(info_frame, text="Port:").grid(
             row=2, column=0, sticky="w", pady=(self.config.PAD_Y, 0)
         )
-        self.port_display_var = tk.StringVar(value=str(DEFAULT_PORT_NUMBER))
+        self.port_display_var = tk.StringVar(value=str(configured_port()))
         self.port_entry = ttk.Entry(
             info_frame, textvariable=self.port_display_var, state="readonly", width=20
         )
@@ -674,30 +1842,17 @@ class LocalFetchServerApp:
     def log_to_gui(self, message):
         self.gui_queue.put({"type": "log", "content": message})
 
-    def get_shared_text(self):
-        return self.shared_text_data
-
-    def update_shared_text(self, new_text, from_client=False):
-        self.shared_text_data = new_text
-        source = "Client" if from_client else "GUI"
-        log_msg = (
-            f"{source} updated text to: '{new_text[:50]}...'"
-            if len(new_text) > 50
-            else f"{source} updated text to: '{new_text}'"
-        )
+    def _on_shared_content_change(self, log_msg):
         self.gui_queue.put({"type": "shared_text_update", "content": log_msg})
 
+    def update_shared_text(self, new_text):
+        self.content.update(new_text.encode("utf-8"), TEXT_CONTENT_TYPE, "GUI")
+
     def update_shared_text_from_gui(self):
         new_text = self.gui_text_input.get()
         if new_text:  # Only update if there is text
             self.gui_text_input.delete(0, tk.END)
-            self.update_shared_text(new_text, from_client=False)
-
-    def update_shared_text_display(self):
-        self.shared_text_display.config(state=tk.NORMAL)
-        self.shared_text_display.delete(1.0, tk.END)
-        self.shared_text_display.insert(tk.END, self.shared_text_data)
-        self.shared_text_display.config(state=tk.DISABLED)
+            self.update_shared_text(new_text)
 
     def _process_gui_queue(self):
         try:
@@ -708,7 +1863,7 @@ class LocalFetchServerApp:
                 if msg_type == "log":
                     self._append_to_log_area(content)
                 elif msg_type == "shared_text_update":
-                    self.update_shared_text_display()
+                    self.shared_text_view.refresh()
                     self._append_to_log_area(content)
                 elif msg_type == "server_status":
                     self.status_label.config(
@@ -736,7 +1891,7 @@ class LocalFetchServerApp:
         self.log_area.config(state=tk.DISABLED)
 
     def start_server(self):
-        self.running_port = DEFAULT_PORT_NUMBER
+        self.running_port = configured_port()
         self.port_display_var.set(str(self.running_port))
 
         try:
@@ -765,6 +1920,9 @@ class LocalFetchServerApp:
             target=self.httpd.serve_forever, daemon=True
         )
         self.server_thread.start()
+        if self.replicator.enabled:
+            self.replicator.port = self.running_port
+            self.replicator.start(self.content.apply_replicated)
 
         self._update_ip_info()  # Fetch and display IPs
         status_update = {
@@ -782,6 +1940,7 @@ class LocalFetchServerApp:
             threading.Thread(target=self.httpd.shutdown, daemon=True).start()
             self.httpd.server_close()
             self.log_to_gui("Server shut down.")
+        self.replicator.stop()
 
         self.httpd = None
         self.server_thread = None